@@ -31,15 +31,44 @@ Examples:
 """
 
 from __future__ import annotations
-from typing import Dict, Optional, Set, TextIO, Tuple
-from collections import defaultdict
-from re import sub
-from math import ceil
+from typing import Dict, List, Optional, TextIO, Tuple
+from collections import Counter, defaultdict
+from functools import partial
+from heapq import heapify, heappop, heappush, heapreplace, nsmallest
+from itertools import islice
+from operator import attrgetter
 
 StringPair = Tuple[str, str]
 
-_SEARCH_SET_TARGET_SIZE = 100
-"""int: This search set size was found to produce speedy results."""
+_HEAP_COMPACTION_FACTOR = 2
+"""int: The heap is rebuilt once it holds this many entries per Bigram."""
+
+_ENCODING_CACHE_SIZE = 100000
+"""int: The maximum number of token encodings a BPEModel keeps before starting over."""
+
+_READ_LINES = 10000
+"""int: The number of lines of text read and tokenized at a time."""
+
+_TOKEN_TABLE = bytes(c if c in b"ABCDEFGHIJKLMNOPQRSTUVWXYZ'" else ord(' ') for c in range(256))
+"""bytes: A translation table that keeps the token characters of capitalized text and
+replaces every other byte with a space."""
+
+
+def _tokenize(text: str) -> List[str]:
+    """Normalizes a text string and splits it into token strings.
+
+    Normalizes the text by capitalizing everything and removing punctuation.
+
+    Args:
+        text: The text string to be tokenized.
+
+    Returns:
+        A list of token strings.
+    """
+
+    # Translating the bytes of the text through a table runs in a single C loop, unlike a regular
+    # expression. Any non-ASCII character is first replaced with '?' and then with a space.
+    return text.upper().encode('ascii', 'replace').translate(_TOKEN_TABLE).decode('ascii').split()
 
 
 class Word:
@@ -51,6 +80,8 @@ class Word:
         subwords (str): The Word's current subword mapping.
     """
 
+    __slots__ = ('token', 'frequency', 'subwords')
+
     def __init__(self, token: str) -> None:
         """Initializes a Word instance.
 
@@ -81,18 +112,53 @@ class Word:
             bpe_model: The BPEModel to be used.
         """
 
-        # Run through each subword concatenation operation in order and apply it to
-        # the subword mapping.
+        # Rather than running through every subword concatenation operation in order, keep a
+        # heap of the adjacent subword pairs which have an operation, keyed by its rank and the
+        # position of the pair. Popping the heap applies the operations in the same order as
+        # running through them, including the left to right order of repeated pairs. Merged
+        # subwords are unlinked from a doubly linked list of positions, and only the two new
+        # pairs around each merge are looked up. Entries whose pair has since changed are
+        # skipped. A new pair is queued at the first operation for it that comes after the one
+        # just applied, following the chain of repeats in the model, if there is one.
         subwords = self.subwords
-        for subword_pair in bpe_model.operations:
-            subword_a, subword_b = subword_pair
-            i = 0
-            while i < len(subwords) - 1:
-                if subwords[i] == subword_a and subwords[i + 1] == subword_b:
-                    # Replace target bigram.
-                    subwords[i] = subword_a + subword_b
-                    del subwords[i + 1]
-                i += 1
+        get_rank = bpe_model._ranks.get
+        next_ranks = bpe_model._next_ranks
+        n = len(subwords)
+        next_position = list(range(1, n + 1))
+        previous_position = list(range(-1, n - 1))
+        heap = []
+        for i, subword_pair in enumerate(zip(subwords, subwords[1:])):
+            rank = get_rank(subword_pair)
+            if rank is not None:
+                heap.append((rank, i, subword_pair))
+        heapify(heap)
+        while heap:
+            rank, i, subword_pair = heappop(heap)
+            j = next_position[i]
+            if j == n or subwords[i] != subword_pair[0] or subwords[j] != subword_pair[1]:
+                continue
+            new_subword = subword_pair[0] + subword_pair[1]
+            subwords[i] = new_subword
+            subwords[j] = None
+            k = next_position[j]
+            next_position[i] = k
+            h = previous_position[i]
+            if h >= 0:
+                new_pair = (subwords[h], new_subword)
+                new_rank = get_rank(new_pair)
+                while new_rank is not None and new_rank < rank:
+                    new_rank = next_ranks[new_rank]
+                if new_rank is not None:
+                    heappush(heap, (new_rank, h, new_pair))
+            if k < n:
+                previous_position[k] = i
+                new_pair = (new_subword, subwords[k])
+                new_rank = get_rank(new_pair)
+                while new_rank is not None and new_rank < rank:
+                    new_rank = next_ranks[new_rank]
+                if new_rank is not None:
+                    heappush(heap, (new_rank, i, new_pair))
+        self.subwords = [subword for subword in subwords if subword is not None]
 
 
 class Bigram:
@@ -107,10 +173,10 @@ class Bigram:
         frequency (int): The Bigram's frequency in the text used to generate the Vocabulary.
         token_frequency (Dict[str, int]): A dictionary of tokens which currently contain the
             Bigram in their subword mappings.
-        in_search_set (bool): A boolean indicating whether or not the Bigram is in the
-            current search set for most frequent Bigram.
     """
 
+    __slots__ = ('subword_pair', 'frequency', 'token_frequency')
+
     def __init__(self, subword_pair: StringPair) -> None:
         """Initializes a Bigram instance.
 
@@ -123,7 +189,6 @@ class Bigram:
         self.subword_pair = subword_pair
         self.frequency = 0
         self.token_frequency = defaultdict(int)
-        self.in_search_set = False
 
     def update_token_frequencies(self, token_updates: Dict[str, int]) -> None:
         """Updates the Bigram's frequency statistics.
@@ -136,37 +201,14 @@ class Bigram:
             subword pair in their subword mapping and whose values are the updates.
         """
 
+        token_frequency = self.token_frequency
         for token, n in token_updates.items():
-            self.token_frequency[token] += n
+            token_frequency[token] += n
             # Remove a token from the frequency dictionary if it no longer contains the bigram.
-            if self.token_frequency[token] == 0:
-                del self.token_frequency[token]
+            if token_frequency[token] == 0:
+                del token_frequency[token]
             self.frequency += n
 
-    def add_to_search_set(self, search_set: Set[Bigram]) -> None:
-        """Adds the Bigram to the search set.
-
-        Adds the Bigram to the search set and sets its in_search_set flag to True.
-
-        Args:
-            search_set: The search set.
-        """
-
-        search_set.add(self)
-        self.in_search_set = True
-
-    def remove_from_search_set(self, search_set: Set[Bigram]) -> None:
-        """Removes the Bigram from the search set.
-
-        Removes the Bigram from the search set and sets its in_search_set flag to False.
-
-        Args:
-            search_set: The search set.
-        """
-
-        search_set.remove(self)
-        self.in_search_set = False
-
 
 class Vocabulary:
     """A data structure used to keep track of the unique token strings found in a given
@@ -192,15 +234,26 @@ class Vocabulary:
         occurrences.
 
         Args:
-            file: A file stream containing the text being processed.
+            file: A file stream, or any other iterable of lines, containing the text being
+                processed.
 
         Returns:
             A Vocabulary instance.
         """
 
+        # Count every token occurrence first, then generate each Word once with its total. The
+        # text is tokenized a block of whole lines at a time, so no token is split between blocks,
+        # and the lines are joined with a separator in case they come without line endings.
+        token_counts = Counter()
+        lines_iterator = iter(file)
+        while True:
+            lines = list(islice(lines_iterator, _READ_LINES))
+            if not lines:
+                break
+            token_counts.update(_tokenize('\n'.join(lines)))
         new_vocabulary = cls()
-        for line in file:
-            new_vocabulary.add_text(line)
+        for token, frequency in token_counts.items():
+            new_vocabulary.add_word(token).update_frequency(frequency)
         return new_vocabulary
 
     @classmethod
@@ -222,8 +275,7 @@ class Vocabulary:
             line = line.upper()
             token, frequency = line.split()
             frequency = int(frequency)
-            new_vocabulary.add_word(token)
-            new_vocabulary.words[token].update_frequency(frequency)
+            new_vocabulary.add_word(token).update_frequency(frequency)
         return new_vocabulary
 
     def add_text(self, text: str) -> None:
@@ -235,12 +287,12 @@ class Vocabulary:
             text: The text string to be added.
         """
 
-        text = text.upper()
-        text = sub(r"[^A-Z']", " ", text)
-        for token in text.split():
-            if self.missing(token):
-                self.add_word(token)
-            self.words[token].update_frequency(1)
+        words = self.words
+        for token, n in Counter(_tokenize(text)).items():
+            word = words.get(token)
+            if word is None:
+                word = self.add_word(token)
+            word.update_frequency(n)
 
     def reset_subwords(self) -> None:
         """Resets every Word's subword mapping to individual characters."""
@@ -258,12 +310,9 @@ class Vocabulary:
             True if the token string is missing from the token dictionary and False otherwise.
         """
 
-        if token in self.words:
-            return False
-        else:
-            return True
+        return token not in self.words
 
-    def add_word(self, token: str, bpe_model: Optional[BPEModel] = None) -> None:
+    def add_word(self, token: str, bpe_model: Optional[BPEModel] = None) -> Word:
         """Adds a Word to the token dictionary.
 
         If a BPEModel is provided, it is applied to the Word to produce a subword mapping.
@@ -271,6 +320,9 @@ class Vocabulary:
         Args:
             token: A token string representing the Word to be added.
             bpe_model: Optional; A BPEModel used produce a subword mapping.
+
+        Returns:
+            The new Word instance.
         """
 
         new_word = Word(token)
@@ -278,6 +330,7 @@ class Vocabulary:
         self.characters.update(new_word.subwords)
         if bpe_model:
             new_word.apply_model(bpe_model)
+        return new_word
 
     def num_characters(self) -> int:
         """Returns the size of the Vocabulary's character set.
@@ -301,27 +354,43 @@ class Vocabulary:
         # For every Word which contains the target subword pair in its current subword mapping,
         # replace the subword pair by concatenating its elements into one subword. Keep track
         # of which other subword pairs are lost and gained in each Words's subword mapping and
-        # produce a dictionary of update dictionaries for each of those Bigrams.
+        # produce a dictionary of update dictionaries for each of those Bigrams. The subword
+        # mapping is compacted in place with a separate write index, so the left neighbor of a
+        # replacement is read from the rewritten part and the right neighbor from the original.
         subword_a, subword_b = bigram.subword_pair
+        new_subword = subword_a + subword_b
+        overlapping = subword_a == subword_b
         tokens = bigram.token_frequency.keys()
-        bigram_updates = defaultdict(lambda: defaultdict(int))
+        words = self.words
+        bigram_updates = defaultdict(partial(defaultdict, int))
         for token in tokens:
-            frequency = self.words[token].frequency
-            subwords = self.words[token].subwords
-            i = 0
-            while i < len(subwords) - 1:
-                if subwords[i] == subword_a and subwords[i + 1] == subword_b:
-                    # Replace target bigram.
-                    subwords[i] = subword_a + subword_b
-                    del subwords[i + 1]
+            word = words[token]
+            frequency = word.frequency
+            subwords = word.subwords
+            last = len(subwords) - 1
+            i = j = 0
+            while i <= last:
+                subword = subwords[i]
+                if subword == subword_a and i < last and subwords[i + 1] == subword_b:
                     # Update other bigram frequencies.
-                    if i > 0:
-                        bigram_updates[(subwords[i - 1], subword_a)][token] -= frequency
-                        bigram_updates[(subwords[i - 1], subwords[i])][token] += frequency
-                    if i < len(subwords) - 1:
-                        bigram_updates[(subword_b, subwords[i + 1])][token] -= frequency
-                        bigram_updates[(subwords[i], subwords[i + 1])][token] += frequency
+                    if j > 0:
+                        left = subwords[j - 1]
+                        bigram_updates[(left, subword_a)][token] -= frequency
+                        bigram_updates[(left, new_subword)][token] += frequency
+                    if i < last - 1:
+                        right = subwords[i + 2]
+                        # When the right neighbor is another instance of the target bigram, its
+                        # frequency has already been removed along with the target Bigram.
+                        if not (overlapping and right == subword_b):
+                            bigram_updates[(subword_b, right)][token] -= frequency
+                        bigram_updates[(new_subword, right)][token] += frequency
+                    # Replace target bigram.
+                    subword = new_subword
+                    i += 1
+                subwords[j] = subword
                 i += 1
+                j += 1
+            del subwords[j:]
         return bigram_updates
 
     def map_to_subwords(self, token: str) -> str:
@@ -337,7 +406,7 @@ class Vocabulary:
         subwords = self.words[token].subwords
         return ' '.join(subwords)
 
-    def write(self, file: TextIO) -> None:
+    def write(self, file: TextIO, max_words: Optional[int] = None) -> None:
         """Writes the Vocabulary to a file.
 
         Writes a vocabulary file with each line containing a unique token string followed
@@ -346,9 +415,19 @@ class Vocabulary:
 
         Args:
             file: The file stream to be written to.
+            max_words: Optional; The maximum number of Words to be written. If provided, only
+                the most frequent Words are written.
         """
 
-        for word in sorted(self.words.values(), key=lambda x: (-x.frequency, x.token)):
+        if max_words is not None and max_words < len(self.words):
+            # Select the most frequent Words with a bounded heap instead of sorting them all.
+            words = nsmallest(max_words, self.words.values(), key=lambda word: (-word.frequency, word.token))
+        else:
+            # Sort alphabetically first and then, relying on the sort being stable, by frequency.
+            # Two sorts on attrgetter keys run faster than one on a tuple built by a Python lambda.
+            words = sorted(self.words.values(), key=attrgetter('token'))
+            words.sort(key=attrgetter('frequency'), reverse=True)
+        for word in words:
             file.write(f"{word.token} {word.frequency}\n")
 
 
@@ -362,22 +441,17 @@ class Statistics:
     Attributes:
         bigrams (Dict[StringPair, Bigram]): A dictionary of subword pairs currently
             found in the Vocabulary and their corresponding Bigram instances.
-        max_frequency (int): The frequency of the most common Bigram.
-        search_set (Set[Bigram]): A subset of bigrams guaranteed to contain the most
-            frequent Bigram.
-        threshold (int): The minimum frequency threshold for inclusion in search_set.
-        adaptation_parameter (int): A parameter used to compute the next threshold
-            which is adaptively tuned to make the the next search_set closer to the
-            target size.
+        heap (List[Tuple[int, StringPair]]): A heap of negated frequencies and subword
+            pairs, whose smallest valid entry belongs to the most frequent Bigram. An
+            entry is valid if its subword pair is in bigrams with a matching frequency.
+            Every Bigram has an entry holding at least its frequency; outdated entries
+            are corrected or discarded lazily.
     """
     def __init__(self) -> None:
         """Initializes an empty Statistics instance."""
 
         self.bigrams = {}
-        self.max_frequency = 0
-        self.search_set = set()
-        self.threshold = None
-        self.adaptation_parameter = 0
+        self.heap = []
 
     @classmethod
     def from_vocabulary(cls, vocabulary: Vocabulary) -> Statistics:
@@ -391,23 +465,22 @@ class Statistics:
         """
 
         # Build a bigram dictionary by counting the subword pairs found in each Word and scaling
-        # the counts by the Word's frequency. Before building the initial search set, use the
-        # most common Bigram's frequency to compute the search set's minimum frequency threshold.
+        # the counts by the Word's frequency. The counts are gathered in plain dictionaries first
+        # and each Bigram is generated once with its final counts. Afterwards, build the heap.
         new_statistics = cls()
+        pair_token_frequencies = defaultdict(dict)
         for word in vocabulary.words.values():
             token = word.token
             subwords = word.subwords
             frequency = word.frequency
-            for i in range(len(subwords)-1):
-                pair = (subwords[i], subwords[i + 1])
-                if new_statistics.missing(pair):
-                    new_statistics.add_bigram(pair)
-                bigram = new_statistics.bigrams[pair]
-                bigram.update_token_frequencies({token: frequency})
-                if bigram.frequency > new_statistics.max_frequency:
-                    new_statistics.max_frequency = bigram.frequency
-        new_statistics.set_threshold(new_statistics.max_frequency)
-        new_statistics.build_search_set()
+            for pair in zip(subwords, subwords[1:]):
+                token_frequency = pair_token_frequencies[pair]
+                token_frequency[token] = token_frequency.get(token, 0) + frequency
+        for pair, token_frequency in pair_token_frequencies.items():
+            bigram = new_statistics.add_bigram(pair)
+            bigram.token_frequency.update(token_frequency)
+            bigram.frequency = sum(token_frequency.values())
+        new_statistics.build_heap()
         return new_statistics
 
     def missing(self, subword_pair: StringPair) -> bool:
@@ -420,23 +493,26 @@ class Statistics:
             True if the subword pair is missing from the bigram dictionary and False otherwise.
         """
 
-        if subword_pair in self.bigrams:
-            return False
-        else:
-            return True
+        return subword_pair not in self.bigrams
 
-    def add_bigram(self, subword_pair: StringPair) -> None:
+    def add_bigram(self, subword_pair: StringPair) -> Bigram:
         """Adds a Bigram to the bigram dictionary.
 
         Args:
             subword_pair: A subword pair representing the Bigram to be added.
+
+        Returns:
+            The new Bigram instance.
         """
 
         new_bigram = Bigram(subword_pair)
         self.bigrams[subword_pair] = new_bigram
+        return new_bigram
 
     def remove_bigram(self, bigram: Bigram) -> None:
-        """Removes a Bigram from the bigram dictionary and the search set.
+        """Removes a Bigram from the bigram dictionary.
+
+        Its heap entries become outdated and are discarded by max_bigram().
 
         Args:
             bigram: The Bigram to be removed.
@@ -444,7 +520,6 @@ class Statistics:
 
         subword_pair = bigram.subword_pair
         del self.bigrams[subword_pair]
-        bigram.remove_from_search_set(self.search_set)
 
     def update_bigram_frequencies(self, bigram_updates: dict) -> None:
         """Updates the frequency statistics for each subword pair in the given update dictionary.
@@ -455,79 +530,57 @@ class Statistics:
         """
 
         # For each subword pair in the update dictionary, update its corresponding Bigram instance.
-        # If a Bigram's frequency is greater than or equal to the search set's threshold, add it to
-        # the search set. Otherwise, if it is in the search set, remove it.
+        # Only push an entry onto the heap when the Bigram's frequency has grown. When it has
+        # shrunk, its newest entry still holds an upper bound on its frequency, and max_bigram()
+        # corrects the entry once it reaches the top of the heap.
+        bigrams = self.bigrams
+        heap = self.heap
         for subword_pair, token_updates in bigram_updates.items():
-            if self.missing(subword_pair):
-                self.add_bigram(subword_pair)
-            bigram = self.bigrams[subword_pair]
+            bigram = bigrams.get(subword_pair)
+            if bigram is None:
+                bigram = self.add_bigram(subword_pair)
+            frequency = bigram.frequency
             bigram.update_token_frequencies(token_updates)
-            if bigram.frequency >= self.threshold:
-                if not bigram.in_search_set:
-                    bigram.add_to_search_set(self.search_set)
-            else:
-                if bigram.in_search_set:
-                    bigram.remove_from_search_set(self.search_set)
             # Remove a pair from the bigram dictionary if it no longer appears in any subword mappings.
             if bigram.frequency == 0:
-                del self.bigrams[subword_pair]
-
-    def set_threshold(self, max_frequency: Optional[int] = None) -> None:
-        """Sets a new frequency threshold for the search set.
+                del bigrams[subword_pair]
+            elif bigram.frequency > frequency:
+                heappush(heap, (-bigram.frequency, subword_pair))
+        if len(heap) > _HEAP_COMPACTION_FACTOR * len(bigrams):
+            self.build_heap()
 
-        If a maximum bigram frequency is provided, use it in place of the previous threshold.
+    def build_heap(self) -> None:
+        """Builds a new heap with a single entry for each Bigram."""
 
-        Args:
-            max_frequency: Optional; The maximum bigram frequency.
-        """
+        self.heap = [(-bigram.frequency, subword_pair) for subword_pair, bigram in self.bigrams.items()]
+        heapify(self.heap)
 
-        previous_threshold = self.threshold
-        if max_frequency:
-            previous_threshold = max_frequency
-        reduction_factor = 1 + 2 ** self.adaptation_parameter
-        self.threshold = min(ceil(previous_threshold / reduction_factor), previous_threshold - 1)
-
-    def build_search_set(self) -> None:
-        """Builds a new search set."""
-
-        # Iterate through the entire bigram dictionary and add to the search set each Bigram
-        # that meets the frequency threshold. Afterwards, adjust the adaptation parameter so
-        # that the next search set is closer to the target size.
-        for bigram in self.bigrams.values():
-            if bigram.frequency >= self.threshold:
-                bigram.add_to_search_set(self.search_set)
-        search_set_size = len(self.search_set)
-        if search_set_size < _SEARCH_SET_TARGET_SIZE:
-            self.adaptation_parameter += 1
-        elif search_set_size > _SEARCH_SET_TARGET_SIZE:
-            self.adaptation_parameter -= 2
-
-    def max_bigram(self) -> Bigram:
+    def max_bigram(self) -> Optional[Bigram]:
         """Finds the most frequent Bigram.
 
+        Ties are broken by choosing the alphabetically smallest subword pair.
+
         Returns:
-            The most frequent Bigram.
+            The most frequent Bigram, or None if the bigram dictionary is empty.
         """
 
-        # If the bigram dictionary is empty, all the words in the vocabulary have been
-        # concatenated into single subwords; return None. Otherwise, search the search
-        # set for the most frequent bigram. If the search set is empty, reduce the
-        # frequency threshold, rebuild the search set, and run max_bigram() again.
-        max_bigram = None
-        if self.bigrams:
-            if self.search_set:
-                max_bigram = next(iter(self.search_set))
-                for bigram in self.search_set:
-                    if bigram.frequency > max_bigram.frequency:
-                        max_bigram = bigram
-                    elif max_bigram.frequency == self.max_frequency:
-                        break
+        # Every Bigram has an entry holding at least its current frequency, so an entry at the top
+        # of the heap which matches its Bigram's frequency belongs to the most frequent Bigram.
+        # Entries of removed Bigrams and entries below their Bigram's frequency are discarded, and
+        # entries above it are replaced with the current frequency. If the heap runs out, all the
+        # words in the vocabulary have been concatenated into single subwords; return None.
+        heap = self.heap
+        bigrams = self.bigrams
+        while heap:
+            negative_frequency, subword_pair = heap[0]
+            bigram = bigrams.get(subword_pair)
+            if bigram is None or bigram.frequency > -negative_frequency:
+                heappop(heap)
+            elif bigram.frequency < -negative_frequency:
+                heapreplace(heap, (-bigram.frequency, subword_pair))
             else:
-                self.set_threshold()
-                self.build_search_set()
-                max_bigram = self.max_bigram()
-            self.max_frequency = max_bigram.frequency
-        return max_bigram
+                return bigram
+        return None
 
 
 class BPEModel:
@@ -536,14 +589,33 @@ class BPEModel:
     The model consists of an ordered list of subword concatenation operations. Each operation
     is represented by a tuple of the two subword strings to be concatenated.
 
+    Operations are only added through add_operation, which also keeps the rank tables used by
+    Word.apply_model in step with them.
+
     Attributes:
-        operations (List[StringPair]): An ordered list of subword concatenation operations.
+        encodings (Dict[str, str]): A dictionary of token strings already encoded with the
+            model and their subword strings. It is cleared whenever the number of operations
+            has changed since it was filled.
     """
 
+    __slots__ = ('_operations', '_ranks', '_next_ranks', 'encodings', '_encoded_operations')
+
     def __init__(self) -> None:
         """Initializes an empty BPEModel instance."""
 
-        self.operations = []
+        self._operations = []
+        # The index in _operations of the first operation for each subword pair, and for each
+        # operation the index of the next one with the same subword pair, or None.
+        self._ranks = {}
+        self._next_ranks = []
+        self.encodings = {}
+        self._encoded_operations = 0
+
+    @property
+    def operations(self) -> Tuple[StringPair, ...]:
+        """Tuple[StringPair, ...]: An ordered tuple of subword concatenation operations."""
+
+        return tuple(self._operations)
 
     @classmethod
     def from_model_file(cls, file: TextIO) -> BPEModel:
@@ -564,18 +636,55 @@ class BPEModel:
         for line in file:
             line = line.upper()
             subword_a, subword_b = line.split()
-            new_bigram = Bigram((subword_a, subword_b))
-            new_bpe_model.add_operation(new_bigram)
+            new_bpe_model.add_operation((subword_a, subword_b))
         return new_bpe_model
 
-    def add_operation(self, bigram: Bigram) -> None:
+    def add_operation(self, subword_pair: StringPair) -> None:
         """Adds an operation to the BPEModel.
 
         Args:
-            bigram: The Bigram to be added as a subword concatenation operation.
+            subword_pair: The subword pair to be added as a subword concatenation operation.
+        """
+
+        # A model may repeat an operation, since a subword removed by one concatenation can be
+        # rebuilt from a different pair later on. Repeats of a subword pair are chained from
+        # its first rank so that apply_model can find the next one still to be applied.
+        rank = len(self._operations)
+        previous_rank = self._ranks.setdefault(subword_pair, rank)
+        if previous_rank != rank:
+            next_ranks = self._next_ranks
+            while next_ranks[previous_rank] is not None:
+                previous_rank = next_ranks[previous_rank]
+            next_ranks[previous_rank] = rank
+        self._next_ranks.append(None)
+        self._operations.append(subword_pair)
+
+    def encode_token(self, token: str) -> str:
+        """Maps a token string to a subword string using the BPEModel.
+
+        Args:
+            token: The token string to be mapped.
+
+        Returns:
+            The subword string matching the token string.
         """
 
-        self.operations.append(bigram.subword_pair)
+        # Natural text repeats the same tokens over and over, so keep the subword string of
+        # every token encoded so far. The cache is keyed to the number of operations it was
+        # filled with and starts over when that changes or once it reaches its size limit.
+        encodings = self.encodings
+        if self._encoded_operations != len(self._operations):
+            encodings.clear()
+            self._encoded_operations = len(self._operations)
+        subword_string = encodings.get(token)
+        if subword_string is None:
+            word = Word(token)
+            word.apply_model(self)
+            subword_string = ' '.join(word.subwords)
+            if len(encodings) >= _ENCODING_CACHE_SIZE:
+                encodings.clear()
+            encodings[token] = subword_string
+        return subword_string
 
     def write(self, file: TextIO) -> None:
         """Writes the BPEModel to a file.
@@ -588,7 +697,7 @@ class BPEModel:
             file: The file stream to be written to.
         """
 
-        for operation in self.operations:
+        for operation in self._operations:
             file.write(f"{operation[0]} {operation[1]}\n")
 
 
@@ -620,7 +729,7 @@ def train_model(vocabulary: Vocabulary, max_subwords: int = 1000) -> BPEModel:
         if max_bigram is None:
             print(f"Stopped early with {i} operations")
             break
-        bpe_model.add_operation(max_bigram)
+        bpe_model.add_operation(max_bigram.subword_pair)
         bigram_updates = vocabulary.replace_bigram(max_bigram)
         statistics.remove_bigram(max_bigram)
         statistics.update_bigram_frequencies(bigram_updates)
@@ -634,7 +743,8 @@ def encode_text(text: str, bpe_model: BPEModel, vocabulary: Optional[Vocabulary]
 
     If providing a Vocabulary, its subwords mappings should have been generated using the
     given BPEModel. New Word instances may be added to the Vocabulary, so make a copy to
-    input if you want the original to remain unchanged.
+    input if you want the original to remain unchanged. Otherwise, the token encodings are
+    cached by the BPEModel and reused across calls.
 
     Args:
         text: The text string to be encoded into subwords.
@@ -647,14 +757,17 @@ def encode_text(text: str, bpe_model: BPEModel, vocabulary: Optional[Vocabulary]
     """
 
     if vocabulary is None:
-        vocabulary = Vocabulary()
+        encode_token = bpe_model.encode_token
+        return ' '.join([encode_token(token) for token in _tokenize(text)])
+    # Each token's Word is looked up once and its subwords are joined directly, instead of a
+    # membership test followed by the lookup inside map_to_subwords.
+    words = vocabulary.words
     encodings = []
-    text = text.upper()
-    text = sub(r"[^A-Z']", " ", text)
-    for token in text.split():
-        if vocabulary.missing(token):
-            vocabulary.add_word(token, bpe_model)
-        encodings.append(vocabulary.map_to_subwords(token))
+    for token in _tokenize(text):
+        word = words.get(token)
+        if word is None:
+            word = vocabulary.add_word(token, bpe_model)
+        encodings.append(' '.join(word.subwords))
     return ' '.join(encodings)
 
 
@@ -6,11 +6,19 @@ Uses a BPE model to breakup a text file into subwords and writes the result to a
 Example::
 
     bpe_encode_text.py --bpe-model bpe_model.txt --text sample_text.txt --output subwords.txt
+
+Large text files can be encoded by several worker processes::
+
+    bpe_encode_text.py --bpe-model bpe_model.txt --text sample_text.txt --output subwords.txt --jobs 4
 """
 
 import argparse
+from itertools import islice
+from multiprocessing import Pool
 
-from bpe import Vocabulary, BPEModel, encode_text
+from bpe import BPEModel, encode_text
+
+LINES_PER_BLOCK = 1000
 
 
 class Arguments:
@@ -18,9 +26,11 @@ class Arguments:
         self.bpe_model_path = args.bpe_model
         self.text_path = args.text
         self.subword_path = args.output
+        self.jobs = args.jobs
 
     def valid(self):
-        return self.bpe_model_path is not None and self.text_path is not None and self.subword_path is not None
+        return (self.bpe_model_path is not None and self.text_path is not None and self.subword_path is not None
+                and self.jobs > 0)
 
     @staticmethod
     def get_parser():
@@ -34,6 +44,10 @@ class Arguments:
         parser.add_argument("--output",
                             help="file path for subword output",
                             type=str)
+        parser.add_argument("--jobs",
+                            help="number of worker processes used to encode the text",
+                            type=int,
+                            default=1)
         return parser
 
     def invalid_opts(self):
@@ -44,22 +58,61 @@ class Arguments:
             message += "Text file must be specified\n"
         if self.subword_path is None:
             message += "Output file must be specified\n"
+        if self.jobs <= 0:
+            message += "Number of jobs must be positive\n"
         return message
 
 
+# Model of a worker process, loaded once by init_worker.
+worker_bpe_model = None
+
+
+def init_worker(bpe_model_path):
+    global worker_bpe_model
+    with open(bpe_model_path, 'r') as bpe_model_file:
+        worker_bpe_model = BPEModel.from_model_file(bpe_model_file)
+
+
+def encode_lines(lines):
+    return "\n".join(encode_text(line, worker_bpe_model) for line in lines) + "\n"
+
+
+def read_blocks(text_file):
+    while True:
+        lines = list(islice(text_file, LINES_PER_BLOCK))
+        if not lines:
+            break
+        yield lines
+
+
 def bpe_encode_text(args):
     bpe_model_path = args.bpe_model_path
     text_path = args.text_path
     subword_path = args.subword_path
 
+    if args.jobs > 1:
+        # Each worker keeps its own BPEModel and encoding cache, so a token is only mapped to
+        # subwords once per worker. Blocks of lines are written back in their original order.
+        with open(text_path, 'r') as text_file, open(subword_path, 'w') as subword_file, \
+                Pool(args.jobs, initializer=init_worker, initargs=(bpe_model_path,)) as pool:
+            for block in pool.imap(encode_lines, read_blocks(text_file)):
+                subword_file.write(block)
+        return
+
     with open(bpe_model_path, 'r') as bpe_model_file:
         bpe_model = BPEModel.from_model_file(bpe_model_file)
 
+    # Without a Vocabulary, encode_text reuses the token encodings cached by the BPEModel, whose
+    # size is bounded, so memory stays flat however many unique tokens the text contains.
     with open(text_path, 'r') as text_file, open(subword_path, 'w') as subword_file:
-        vocabulary = Vocabulary()
+        lines = []
         for line in text_file:
-            subwords = encode_text(line, bpe_model, vocabulary)
-            subword_file.write(subwords + "\n")
+            lines.append(encode_text(line, bpe_model))
+            if len(lines) == LINES_PER_BLOCK:
+                subword_file.write("\n".join(lines) + "\n")
+                lines.clear()
+        if lines:
+            subword_file.write("\n".join(lines) + "\n")
 
 
 def main():
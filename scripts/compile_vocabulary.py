@@ -12,6 +12,10 @@ Output file format::
 Example::
 
     compile_vocabulary.py --text sample_text.txt --output vocabulary.txt
+
+Only the most frequent words are saved if a maximum is given::
+
+    compile_vocabulary.py --text sample_text.txt --output vocabulary.txt --max-words 10
 """
 
 import argparse
@@ -23,9 +27,11 @@ class Arguments:
     def __init__(self, args):
         self.text_path = args.text
         self.vocabulary_path = args.output
+        self.max_words = args.max_words
 
     def valid(self):
-        return self.text_path is not None and self.vocabulary_path is not None
+        return (self.text_path is not None and self.vocabulary_path is not None
+                and (self.max_words is None or self.max_words > 0))
 
     @staticmethod
     def get_parser():
@@ -36,6 +42,9 @@ class Arguments:
         parser.add_argument("--output",
                             help="file path for vocabulary output",
                             type=str)
+        parser.add_argument("--max-words",
+                            help="maximum number of words saved, most frequent first",
+                            type=int)
         return parser
 
     def invalid_opts(self):
@@ -44,18 +53,21 @@ class Arguments:
             message += "Text file must be specified\n"
         if self.vocabulary_path is None:
             message += "Output file must be specified\n"
+        if self.max_words is not None and self.max_words <= 0:
+            message += "Maximum number of words must be positive\n"
         return message
 
 
 def compile_vocabulary(args):
     text_path = args.text_path
     vocabulary_path = args.vocabulary_path
+    max_words = args.max_words
 
     with open(text_path, 'r') as text_file:
         vocabulary = Vocabulary.from_text_file(text_file)
 
     with open(vocabulary_path, 'w') as vocabulary_file:
-        vocabulary.write(file=vocabulary_file)
+        vocabulary.write(file=vocabulary_file, max_words=max_words)
 
 
 def main():